@@ -2,6 +2,7 @@ import boto3
 import json
 import time
 import logging
+from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger()
@@ -14,6 +15,37 @@ REGION = "us-east-1"
 
 athena = boto3.client('athena', region_name=REGION)
 
+# Length of the full_time prefix ('YYYY-MM-DD HH:MM:SS') that identifies a frame bucket
+FRAME_BUCKETS = {"hour": 13, "day": 10}
+
+def build_frames(rows, bucket):
+    """Index rows (already ordered by full_time) into animation frames.
+
+    offsets[i] is the exclusive end of frame i, so the cumulative slice shown
+    at frame i is rows[:offsets[i]]. marker_size is aligned with rows.
+    """
+    prefix = FRAME_BUCKETS[bucket]
+    labels, offsets, marker_size = [], [], []
+
+    for i, row in enumerate(rows):
+        label = (row.get('full_time') or '')[:prefix]
+        if labels and labels[-1] == label:
+            offsets[-1] = i + 1
+        else:
+            labels.append(label)
+            offsets.append(i + 1)
+        try:
+            marker_size.append(max(4, float(row.get('mag')) * 3))
+        except (TypeError, ValueError):
+            marker_size.append(4)
+
+    return {
+        "bucket": bucket,
+        "labels": labels,
+        "offsets": offsets,
+        "marker_size": marker_size
+    }
+
 def lambda_handler(event, context):
     # CORS headers for all responses
     cors_headers = {
@@ -54,8 +86,10 @@ def lambda_handler(event, context):
 
         start_date = body.get('start_date')
         end_date = body.get('end_date')
+        since = body.get('since')  # Optional cursor: last full_time the client already holds
+        frame_bucket = body.get('frame_bucket')  # Optional: 'hour' or 'day' for animation frames
         
-        logger.info(f"Query parameters - start_date: {start_date}, end_date: {end_date}")
+        logger.info(f"Query parameters - start_date: {start_date}, end_date: {end_date}, since: {since}")
 
         if not start_date or not end_date:
             return {
@@ -64,12 +98,39 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "start_date and end_date required"})
             }
 
+        if frame_bucket and (not isinstance(frame_bucket, str) or frame_bucket not in FRAME_BUCKETS):
+            return {
+                "statusCode": 400,
+                "headers": cors_headers,
+                "body": json.dumps({"error": f"frame_bucket must be one of: {', '.join(FRAME_BUCKETS)}"})
+            }
+
+        # Delta sync: only return events at or after the cursor. Rows sharing the
+        # cursor's second are sent again so late arrivals are not missed; the
+        # client de-duplicates them by id.
+        since_filter = ""
+        if since:
+            try:
+                if not isinstance(since, str):
+                    raise ValueError(f"since must be a string, got {type(since).__name__}")
+                # strptime also accepts unpadded fields, which would break the string comparison below
+                if datetime.strptime(since, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S') != since:
+                    raise ValueError(f"since is not zero-padded: {since}")
+            except ValueError:
+                return {
+                    "statusCode": 400,
+                    "headers": cors_headers,
+                    "body": json.dumps({"error": "since must be formatted as YYYY-MM-DD HH:MM:SS"})
+                }
+            since_filter = f"AND full_time >= '{since}'"
+
         # More flexible date parsing - try different formats
         query = f"""
             SELECT *
             FROM {DATABASE}.{TABLE}
             WHERE date_parse(event_date, '%Y-%m-%d') 
                 BETWEEN DATE('{start_date}') AND DATE('{end_date}')
+                {since_filter}
             ORDER BY full_time
         """
         
@@ -129,16 +190,24 @@ def lambda_handler(event, context):
                 row_data = [c.get('VarCharValue', None) for c in r['Data']]
                 rows.append(dict(zip(columns, row_data)))
         
-        logger.info(f"Returning {len(rows)} rows")
+        # Rows are ordered by full_time, so the last one is the new cursor
+        watermark = rows[-1].get('full_time') if rows else since
+        logger.info(f"Returning {len(rows)} rows (watermark: {watermark})")
+
+        response_body = {
+            "data": rows,
+            "count": len(rows),
+            "since": since,
+            "watermark": watermark,
+            "query_execution_id": query_execution_id
+        }
+        if frame_bucket:
+            response_body["frames"] = build_frames(rows, frame_bucket)
         
         return {
             "statusCode": 200,
             "headers": cors_headers,
-            "body": json.dumps({
-                "data": rows,
-                "count": len(rows),
-                "query_execution_id": query_execution_id
-            })
+            "body": json.dumps(response_body)
         }
 
     except Exception as e:
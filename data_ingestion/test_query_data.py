@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import query_data
+
+
+def invoke(**body):
+    body = {"start_date": "2025-08-20", "end_date": "2025-08-21", **body}
+    response = query_data.lambda_handler({"body": json.dumps(body)}, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+@pytest.mark.parametrize("since", ["2025-8-20 1:0:0", "2025-08-20", "2025-08-20T01:00:00", 12345, ["2025-08-20 01:00:00"]])
+def test_malformed_since_is_rejected(since):
+    status, body = invoke(since=since)
+    assert status == 400
+    assert body == {"error": "since must be formatted as YYYY-MM-DD HH:MM:SS"}
+
+
+def row(full_time, mag="2.0"):
+    return {"full_time": full_time, "mag": mag}
+
+
+def test_build_frames_groups_rows_by_hour():
+    rows = [
+        row("2025-08-20 00:05:00"), row("2025-08-20 00:40:00"), row("2025-08-20 00:59:59"),
+        row("2025-08-20 01:10:00"),
+        row("2025-08-20 04:00:00"), row("2025-08-20 04:30:00"),  # hours 02-03 have no events
+    ]
+    frames = query_data.build_frames(rows, "hour")
+    assert frames["bucket"] == "hour"
+    assert frames["labels"] == ["2025-08-20 00", "2025-08-20 01", "2025-08-20 04"]
+    assert frames["offsets"] == [3, 4, 6]
+    assert frames["offsets"][-1] == len(rows)
+
+
+def test_build_frames_groups_rows_by_day():
+    rows = [row("2025-08-20 00:05:00"), row("2025-08-20 23:59:59"), row("2025-08-22 12:00:00")]
+    frames = query_data.build_frames(rows, "day")
+    assert frames["labels"] == ["2025-08-20", "2025-08-22"]
+    assert frames["offsets"] == [2, 3]
+
+
+def test_build_frames_marker_sizes_align_with_rows():
+    rows = [row("2025-08-20 00:05:00", "2.5"), row("2025-08-20 00:06:00", "1.0"),
+            row("2025-08-20 01:00:00", None), row("2025-08-20 02:00:00", "n/a")]
+    frames = query_data.build_frames(rows, "hour")
+    assert frames["marker_size"] == [7.5, 4, 4, 4]
+    assert len(frames["marker_size"]) == len(rows)
+
+
+def test_build_frames_without_rows():
+    assert query_data.build_frames([], "hour") == {"bucket": "hour", "labels": [], "offsets": [], "marker_size": []}
+
+
+@pytest.mark.parametrize("frame_bucket", ["week", "HOUR", ["hour"], {"hour": 1}, 3])
+def test_unknown_frame_bucket_is_rejected(frame_bucket):
+    status, body = invoke(frame_bucket=frame_bucket)
+    assert status == 400
+    assert body == {"error": "frame_bucket must be one of: hour, day"}
@@ -1,19 +1,235 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import hashlib
 import httpx
+import json
+import math
 import os
+import time
 from pydantic import BaseModel
 import uvicorn
 
 app = FastAPI()
 
+class AdmissionController:
+    """Token bucket + daily quota mirroring the API Gateway usage plan.
+
+    Requests that find no token wait in per-client FIFO queues which are
+    served round-robin, so one busy client cannot starve the others. Waits
+    are bounded, and requests are shed once the daily quota is nearly used.
+    State is per process, like the single uvicorn worker started below.
+    """
+
+    def __init__(self, rate, burst, daily_quota, quota_reserve, max_wait, max_queue_depth):
+        self.rate = rate
+        self.burst = burst
+        self.daily_quota = daily_quota
+        self.quota_reserve = quota_reserve
+        self.max_wait = max_wait
+        self.max_queue_depth = max_queue_depth
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.quota_day = datetime.now(timezone.utc).date()
+        self.quota_used = 0
+        self.queues = OrderedDict()  # client_id -> deque of waiting futures
+        self.dispatcher = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _roll_quota_day(self):
+        # API Gateway DAY quotas reset at midnight UTC
+        today = datetime.now(timezone.utc).date()
+        if today != self.quota_day:
+            self.quota_day = today
+            self.quota_used = 0
+
+    def _seconds_until_quota_reset(self):
+        now = datetime.now(timezone.utc)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return math.ceil((midnight - now).total_seconds())
+
+    def queue_depth(self):
+        return sum(len(waiters) for waiters in self.queues.values())
+
+    def quota_remaining(self):
+        self._roll_quota_day()
+        return max(0, self.daily_quota - self.quota_used)
+
+    def _admit(self):
+        self.tokens -= 1
+        self.quota_used += 1
+
+    def _discard(self, client_id, waiter):
+        waiters = self.queues.get(client_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self.queues[client_id]
+
+    def _shed(self, detail, retry_after):
+        raise HTTPException(status_code=503, detail=detail, headers={'Retry-After': str(retry_after)})
+
+    async def acquire(self, client_id):
+        """Wait for a slot to call the API Gateway, or raise a 503."""
+        # Queued requests will each spend quota too, so count them up front
+        if self.quota_remaining() - self.queue_depth() <= self.quota_reserve:
+            self._shed("Daily API quota nearly exhausted, try again later", self._seconds_until_quota_reset())
+
+        self._refill()
+        if not self.queues and self.tokens >= 1:
+            self._admit()
+            return
+
+        if self.queue_depth() >= self.max_queue_depth:
+            self._shed("Too many requests queued, try again shortly", math.ceil(self.max_wait))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(client_id, deque()).append(waiter)
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._discard(client_id, waiter)
+            self._shed("Timed out waiting for rate limit, try again shortly", math.ceil(self.max_wait))
+        except asyncio.CancelledError:  # client disconnected while queued
+            self._discard(client_id, waiter)
+            raise
+
+    async def _dispatch(self):
+        while self.queues:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            # Round-robin: serve the oldest waiter of the first client, then move that client to the back
+            client_id, waiters = next(iter(self.queues.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self.queues.move_to_end(client_id)
+            else:
+                del self.queues[client_id]
+
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(None)
+
+    def throttled(self):
+        """Upstream answered 429: drop local tokens so the bucket re-syncs."""
+        self._refill()
+        self.tokens = 0
+
+    def quota_exceeded(self):
+        """Upstream reports the daily quota is used up (e.g. after a restart reset our count): shed until reset."""
+        self._roll_quota_day()
+        self.quota_used = self.daily_quota
+        self._shed("Daily API quota exhausted, try again later", self._seconds_until_quota_reset())
+
+    def stats(self):
+        self._refill()
+        self._roll_quota_day()
+        return {
+            "queue_depth": self.queue_depth(),
+            "tokens_available": round(self.tokens, 2),
+            "quota_used": self.quota_used,
+            "quota_remaining": self.quota_remaining(),
+            "quota_resets_in_seconds": self._seconds_until_quota_reset()
+        }
+
+# Defaults mirror the usage plan in data_ingestion/query_aws_resources.py
+admission = AdmissionController(
+    rate=float(os.environ.get('API_RATE_LIMIT', 5)),
+    burst=int(os.environ.get('API_BURST_LIMIT', 10)),
+    daily_quota=int(os.environ.get('API_DAILY_QUOTA', 1000)),
+    quota_reserve=int(os.environ.get('API_QUOTA_RESERVE', 20)),
+    max_wait=float(os.environ.get('API_MAX_QUEUE_WAIT', 10)),
+    max_queue_depth=int(os.environ.get('API_MAX_QUEUE_DEPTH', 50))
+)
+
+# Number of reverse proxies in front of this server that append to X-Forwarded-For
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 1))
+
+def client_id_for(request: Request) -> str:
+    # Earlier X-Forwarded-For entries are set by the caller and can be spoofed, so take
+    # the address recorded by the outermost trusted proxy
+    forwarded = request.headers.get('x-forwarded-for')
+    if forwarded and TRUSTED_PROXY_HOPS > 0:
+        entries = [entry.strip() for entry in forwarded.split(',') if entry.strip()]
+        if entries:
+            return entries[-min(TRUSTED_PROXY_HOPS, len(entries))]
+    return request.client.host if request.client else 'unknown'
+
 class EarthquakeRequest(BaseModel):
     start_date: str
     end_date: str
+    since: Optional[str] = None  # Delta sync cursor (last full_time held by the client)
+    frame_bucket: Optional[str] = None  # 'hour' or 'day' to get precomputed animation frames
+
+def compute_etag(earthquake_request: EarthquakeRequest, payload: dict) -> str:
+    """Strong ETag over the request window and the returned rows.
+
+    query_execution_id changes on every Athena run, so it is left out to keep
+    the tag stable while the underlying data is unchanged.
+    """
+    fingerprint = json.dumps({
+        'start_date': earthquake_request.start_date,
+        'end_date': earthquake_request.end_date,
+        'since': earthquake_request.since,
+        'frame_bucket': earthquake_request.frame_bucket,
+        'data': payload.get('data', [])
+    }, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha256(fingerprint.encode('utf-8')).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    return bool(if_none_match) and etag in [tag.strip() for tag in if_none_match.split(',')]
+
+# Last ETag served per (range, cursor), so a matching revalidation can be answered
+# without an API Gateway call. Data is ingested daily, so a short TTL only delays
+# new rows by a few minutes at most.
+ETAG_CACHE_TTL = float(os.environ.get('ETAG_CACHE_TTL', 300))
+ETAG_CACHE_MAX_ENTRIES = 1024
+etag_cache = OrderedDict()  # key -> (etag, expires_at)
+
+def etag_cache_key(earthquake_request: EarthquakeRequest) -> tuple:
+    return (
+        earthquake_request.start_date,
+        earthquake_request.end_date,
+        earthquake_request.since,
+        earthquake_request.frame_bucket
+    )
+
+def cached_etag(earthquake_request: EarthquakeRequest) -> Optional[str]:
+    key = etag_cache_key(earthquake_request)
+    entry = etag_cache.get(key)
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    etag_cache.pop(key, None)
+    return None
+
+def remember_etag(earthquake_request: EarthquakeRequest, etag: str):
+    key = etag_cache_key(earthquake_request)
+    etag_cache[key] = (etag, time.monotonic() + ETAG_CACHE_TTL)
+    etag_cache.move_to_end(key)
+    while len(etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+        etag_cache.popitem(last=False)
 
 @app.post("/api/proxy")
-async def proxy_to_lambda(earthquake_request: EarthquakeRequest):
+async def proxy_to_lambda(
+    earthquake_request: EarthquakeRequest,
+    request: Request,
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Proxy requests to your API Gateway Lambda"""
     try:
         api_key = os.environ.get('API_GATEWAY_KEY')
@@ -33,18 +249,47 @@ async def proxy_to_lambda(earthquake_request: EarthquakeRequest):
             'start_date': earthquake_request.start_date,
             'end_date': earthquake_request.end_date
         }
+        if earthquake_request.since:
+            request_body['since'] = earthquake_request.since
+        if earthquake_request.frame_bucket:
+            request_body['frame_bucket'] = earthquake_request.frame_bucket
         
+        # Revalidation of a result served moments ago: answer locally, spending no quota
+        etag = cached_etag(earthquake_request)
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+        client_id = client_id_for(request)
+
         async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(api_url, json=request_body, headers=headers)
+            for attempt in range(2):  # a throttled request goes back through admission once
+                await admission.acquire(client_id)
+                response = await client.post(api_url, json=request_body, headers=headers)
+                if response.status_code != 429:
+                    break
+                # API Gateway answers "Limit Exceeded" for the usage plan quota, "Too Many Requests" for throttling
+                if 'Limit Exceeded' in response.text:
+                    admission.quota_exceeded()
+                admission.throttled()
             
             if response.status_code == 200:
-                return response.json()
+                payload = response.json()
+                etag = compute_etag(earthquake_request, payload)
+                remember_etag(earthquake_request, etag)
+                cache_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+                # Client already holds this exact result: skip the body
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers=cache_headers)
+                return JSONResponse(content=payload, headers=cache_headers)
             else:
                 raise HTTPException(
                     status_code=response.status_code,
                     detail=f"API Gateway error: {response.text}"
                 )
                 
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Request timeout")
     except Exception as e:
@@ -52,7 +297,7 @@ async def proxy_to_lambda(earthquake_request: EarthquakeRequest):
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "admission": admission.stats()}
 
 # Mount static assets
 if os.path.exists("dist/assets"):
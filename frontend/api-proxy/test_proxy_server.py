@@ -0,0 +1,216 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import proxy_server
+from proxy_server import AdmissionController, client_id_for, etag_matches
+
+QUERY = {"start_date": "2025-08-20", "end_date": "2025-08-21"}
+ROWS = [{"id": "us1", "full_time": "2025-08-20 01:00:00", "mag": "2.5"}]
+
+
+def make_controller(**overrides):
+    settings = dict(rate=50, burst=1, daily_quota=1000, quota_reserve=0, max_wait=2, max_queue_depth=50)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def test_burst_is_admitted_immediately_then_queued():
+    async def scenario():
+        controller = make_controller(rate=0.1, burst=3, max_wait=0.05)
+        for _ in range(3):
+            await controller.acquire("a")
+        with pytest.raises(HTTPException) as excinfo:
+            await controller.acquire("a")
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Timed out" in error.detail
+    assert controller.quota_used == 3
+
+
+def test_waiters_are_served_round_robin_per_client():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire("warmup")  # spend the only burst token
+        order = []
+
+        async def request(client_id):
+            await controller.acquire(client_id)
+            order.append(client_id)
+
+        await asyncio.gather(*(request(client_id) for client_id in ["a", "a", "a", "b", "b"]))
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "a", "b", "a"]
+
+
+def test_timed_out_waiters_leave_the_queue():
+    async def scenario():
+        controller = make_controller(rate=0.1, burst=1, max_wait=0.2, max_queue_depth=3)
+        await controller.acquire("a")
+        results = await asyncio.gather(*(controller.acquire("a") for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, HTTPException) for result in results)
+        stats = controller.stats()
+
+        # Queue is free again: the next request waits (and times out) instead of being shed as full
+        with pytest.raises(HTTPException) as excinfo:
+            await controller.acquire("b")
+        return controller, stats, excinfo.value
+
+    controller, stats, error = asyncio.run(scenario())
+    assert stats["queue_depth"] == 0
+    assert "Timed out" in error.detail
+    assert not controller.queues
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def scenario():
+        controller = make_controller(rate=0.1, burst=1)
+        await controller.acquire("a")
+        task = asyncio.create_task(controller.acquire("a"))
+        await asyncio.sleep(0.01)
+        assert controller.queue_depth() == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.queue_depth() == 0
+    assert not controller.queues
+
+
+def test_requests_are_shed_once_quota_reserve_is_reached():
+    async def scenario():
+        controller = make_controller(burst=10, daily_quota=5, quota_reserve=2)
+        for _ in range(3):
+            await controller.acquire("a")
+        with pytest.raises(HTTPException) as excinfo:
+            await controller.acquire("a")
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "quota" in error.detail
+    assert int(error.headers["Retry-After"]) > 0
+    assert controller.quota_used == 3
+
+
+def make_request(forwarded_for=None):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_client_id_uses_entry_appended_by_trusted_proxy():
+    assert client_id_for(make_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert client_id_for(make_request("1.2.3.4")) == "1.2.3.4"
+
+
+def test_client_id_falls_back_to_peer_address():
+    assert client_id_for(make_request()) == "10.0.0.1"
+
+
+def test_quota_exceeded_sheds_until_reset():
+    async def scenario():
+        controller = make_controller(burst=10)
+        with pytest.raises(HTTPException) as upstream:
+            controller.quota_exceeded()
+        with pytest.raises(HTTPException) as following:
+            await controller.acquire("a")
+        return controller, upstream.value, following.value
+
+    controller, upstream, following = asyncio.run(scenario())
+    assert controller.quota_remaining() == 0
+    for error in (upstream, following):
+        assert error.status_code == 503
+        assert int(error.headers["Retry-After"]) > 0
+
+
+def test_stats_reset_quota_on_new_day():
+    controller = make_controller(daily_quota=1000)
+    controller.quota_used = 990
+    controller.quota_day -= timedelta(days=1)
+    stats = controller.stats()
+    assert stats["quota_used"] == 0
+    assert stats["quota_remaining"] == 1000
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Mocked API Gateway: replies with queued responses, then 200 with ROWS."""
+    monkeypatch.setenv("API_GATEWAY_KEY", "test-key")
+    monkeypatch.setenv("API_GATEWAY_URL", "https://gateway.test/prod/earthquake-data")
+    monkeypatch.setattr(proxy_server, "admission", make_controller(burst=10))
+    proxy_server.etag_cache.clear()
+    mock = SimpleNamespace(responses=[], calls=[])
+
+    async def post(self, url, json=None, headers=None):
+        mock.calls.append(json)
+        if mock.responses:
+            return mock.responses.pop(0)
+        return httpx.Response(200, json={"data": ROWS, "count": len(ROWS), "query_execution_id": str(len(mock.calls))})
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", post)
+    return mock
+
+
+def test_throttled_request_is_requeued_once(upstream):
+    upstream.responses.append(httpx.Response(429, json={"message": "Too Many Requests"}))
+    response = TestClient(proxy_server.app).post("/api/proxy", json=QUERY)
+    assert response.status_code == 200
+    assert len(upstream.calls) == 2
+
+
+def test_upstream_quota_error_sheds_until_reset(upstream):
+    upstream.responses.append(httpx.Response(429, json={"message": "Limit Exceeded"}))
+    client = TestClient(proxy_server.app)
+    first = client.post("/api/proxy", json=QUERY)
+    second = client.post("/api/proxy", json=QUERY)
+    assert [first.status_code, second.status_code] == [503, 503]
+    assert int(second.headers["Retry-After"]) > 0
+    assert len(upstream.calls) == 1
+
+
+def test_etag_matches_any_tag_in_list():
+    assert etag_matches('"abc", "def"', '"def"')
+    assert not etag_matches('"abc", "def"', '"xyz"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_revalidation_hit_is_answered_without_upstream_call(upstream):
+    client = TestClient(proxy_server.app)
+    first = client.post("/api/proxy", json=QUERY)
+    second = client.post("/api/proxy", json=QUERY, headers={"If-None-Match": first.headers["ETag"]})
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(upstream.calls) == 1
+    assert proxy_server.admission.quota_used == 1
+
+
+def test_expired_etag_revalidates_upstream(upstream):
+    client = TestClient(proxy_server.app)
+    etag = client.post("/api/proxy", json=QUERY).headers["ETag"]
+    for key, (cached, _) in list(proxy_server.etag_cache.items()):
+        proxy_server.etag_cache[key] = (cached, 0)  # already expired
+    response = client.post("/api/proxy", json=QUERY, headers={"If-None-Match": etag})
+    assert response.status_code == 304  # data unchanged, but only known after asking upstream
+    assert len(upstream.calls) == 2
+
+
+@pytest.mark.parametrize("change", [{"since": "2025-08-20 01:00:00"}, {"frame_bucket": "hour"}])
+def test_etag_is_scoped_to_cursor_and_frame_bucket(upstream, change):
+    client = TestClient(proxy_server.app)
+    etag = client.post("/api/proxy", json=QUERY).headers["ETag"]
+    response = client.post("/api/proxy", json={**QUERY, **change}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(upstream.calls) == 2
@@ -1,10 +1,30 @@
-import React, { useState, useRef, useEffect } from 'react';
+import React, { useState, useRef, useEffect, useMemo } from 'react';
 import Plotly from 'plotly.js-dist';
 
+const FRAME_BUCKET = 'hour'; // the time-lapse advances one hour of events per frame
+const FRAME_PREFIX = { hour: 13, day: 10 }; // length of the full_time prefix identifying a bucket
+
+// Same frame index the query Lambda returns, rebuilt locally after a delta merge
+const buildFrames = (rows, bucket = FRAME_BUCKET) => {
+  const frames = { bucket, labels: [], offsets: [], marker_size: [] };
+  rows.forEach((eq, i) => {
+    const label = (eq.full_time || '').slice(0, FRAME_PREFIX[bucket]);
+    if (frames.labels[frames.labels.length - 1] === label) {
+      frames.offsets[frames.offsets.length - 1] = i + 1;
+    } else {
+      frames.labels.push(label);
+      frames.offsets.push(i + 1);
+    }
+    frames.marker_size.push(Math.max(4, eq.mag * 3) || 4);
+  });
+  return frames;
+};
+
 const EarthquakeApp = () => {
   const [startDate, setStartDate] = useState('2025-08-20');
   const [endDate, setEndDate] = useState('2025-08-21');
   const [earthquakeData, setEarthquakeData] = useState([]);
+  const [frames, setFrames] = useState(null); // { offsets, marker_size } indexing earthquakeData into animation frames
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [isPlaying, setIsPlaying] = useState(false);
@@ -13,27 +33,57 @@ const EarthquakeApp = () => {
   const [animationSpeed, setAnimationSpeed] = useState(1); // 1x, 2x, 4x, 8x
   const plotRef = useRef(null);
   const animationRef = useRef(null);
+  const syncRef = useRef({ startDate: null, endDate: null, etag: null, etagSince: null, watermark: null }); // delta sync state for the last fetched range
+
+  const mergeEarthquakes = (existing, incoming) => {
+    const byId = new Map(existing.map(eq => [eq.id, eq]));
+    incoming.forEach(eq => byId.set(eq.id, eq)); // new events are added, revised ones replace the old copy
+    return Array.from(byId.values());
+  };
 
   const fetchData = async () => {
     setLoading(true);
     setError('');
     
+    // Re-fetching the same range only asks for what changed since the last sync
+    const sync = syncRef.current;
+    const isRefresh = sync.startDate === startDate && sync.endDate === endDate && earthquakeData.length > 0;
+    // The ETag only describes a response for the same cursor, so the first delta after a full fetch can't revalidate
+    const canRevalidate = isRefresh && sync.etag && sync.etagSince === sync.watermark;
+
     try {
       const response = await fetch(import.meta.env.VITE_API_URL, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json',
-                   'X-API-Key': import.meta.env.VITE_API_KEY  // Add this header
+                   'X-API-Key': import.meta.env.VITE_API_KEY,  // Add this header
+                   ...(canRevalidate ? { 'If-None-Match': sync.etag } : {})
                  },
-        body: JSON.stringify({ start_date: startDate, end_date: endDate })
+        body: JSON.stringify({
+          start_date: startDate,
+          end_date: endDate,
+          ...(isRefresh && sync.watermark ? { since: sync.watermark } : { frame_bucket: FRAME_BUCKET })
+        })
       });
 
+      if (response.status === 304) return; // nothing changed since the last sync
       if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
       
       const data = await response.json();
-      const sortedData = (data.data || []).sort((a, b) => new Date(a.full_time) - new Date(b.full_time)); // (a,b) is needed as you deal with numbers
+      const rows = isRefresh ? mergeEarthquakes(earthquakeData, data.data || []) : (data.data || []);
+      const sortedData = rows.sort((a, b) => (a.full_time < b.full_time ? -1 : a.full_time > b.full_time ? 1 : 0)); // lexical on the UTC strings, same order as Athena's ORDER BY and the frame offsets
+      syncRef.current = {
+        startDate,
+        endDate,
+        etag: response.headers.get('ETag'),
+        etagSince: isRefresh ? sync.watermark : null, // cursor this ETag was computed for
+        watermark: data.watermark || sortedData[sortedData.length - 1]?.full_time || null
+      };
       setEarthquakeData(sortedData);
-      setCurrentIndex(0); // index of the first earthquake to display
-      setIsPlaying(false);
+      setFrames(!isRefresh && data.frames ? data.frames : buildFrames(sortedData)); // a merged delta shifts offsets, so re-index
+      if (!isRefresh) {
+        setCurrentIndex(0); // index of the first earthquake to display
+        setIsPlaying(false);
+      }
     } catch (err) {
       setError(`Failed to fetch data: ${err.message}`);
     } finally {
@@ -120,15 +170,23 @@ const EarthquakeApp = () => {
     }
   };
 
+  // Columnar copies built once per dataset, so each frame is a cheap slice instead of four re-maps
+  const columns = useMemo(() => ({
+    lat: Float64Array.from(earthquakeData, eq => eq.latitude),
+    lon: Float64Array.from(earthquakeData, eq => eq.longitude),
+    text: earthquakeData.map(eq => `Mag: ${eq.mag}<br>Location: ${eq.place}<br>Time: ${eq.full_time}<br>Depth: ${eq.depth} km`),
+    size: Float64Array.from(frames?.marker_size?.length === earthquakeData.length ? frames.marker_size : buildFrames(earthquakeData).marker_size)
+  }), [earthquakeData, frames]);
+
   const updateMap = (index) => {
     if (!plotRef.current || !earthquakeData.length) return;
 
-    const current = earthquakeData.slice(0, index + 1);
+    const end = index + 1;
     const update = {
-      lat: [current.map(eq => eq.latitude)], // Loops over an array and returns a new array with the results of the callback function (forEach does not return a new element)
-      lon: [current.map(eq => eq.longitude)],
-      text: [current.map(eq => `Mag: ${eq.mag}<br>Location: ${eq.place}<br>Time: ${eq.full_time}<br>Depth: ${eq.depth} km`)],
-      'marker.size': [current.map(eq => Math.max(4, eq.mag * 3))]
+      lat: [columns.lat.slice(0, end)], // Typed array slices are plain memory copies, no per-event callback
+      lon: [columns.lon.slice(0, end)],
+      text: [columns.text.slice(0, end)],
+      'marker.size': [columns.size.slice(0, end)]
     };
 
     Plotly.restyle(plotRef.current, update, [0]);
@@ -177,22 +235,15 @@ const EarthquakeApp = () => {
 
   useEffect(() => {
     if (isPlaying && currentIndex < earthquakeData.length) {
-      // Group earthquakes by hour
-      const currentTime = new Date(earthquakeData[currentIndex]?.full_time);
-      const currentHour = new Date(currentTime.getFullYear(), currentTime.getMonth(), currentTime.getDate(), currentTime.getHours());
-      
-      // Find all earthquakes in the same hour
-      let nextIndex = currentIndex;
-      while (nextIndex < earthquakeData.length) {
-        const eqTime = new Date(earthquakeData[nextIndex].full_time);
-        const eqHour = new Date(eqTime.getFullYear(), eqTime.getMonth(), eqTime.getDate(), eqTime.getHours());
-        
-        if (eqHour.getTime() === currentHour.getTime()) {
-          nextIndex++;
-        } else {
-          break;
-        }
+      // Find the frame (hour bucket) containing currentIndex: first offset past it
+      const offsets = frames?.offsets || [earthquakeData.length];
+      let [lo, hi] = [0, offsets.length - 1];
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (offsets[mid] > currentIndex) hi = mid;
+        else lo = mid + 1;
       }
+      const nextIndex = Math.min(Math.max(offsets[lo], currentIndex + 1), earthquakeData.length);
       
       updateMap(nextIndex - 1);
       
@@ -204,7 +255,7 @@ const EarthquakeApp = () => {
         setIsPlaying(false);
       }
     }
-  }, [currentIndex, isPlaying, earthquakeData, animationSpeed]);
+  }, [currentIndex, isPlaying, earthquakeData, frames, animationSpeed]);
 
   const styles = {
     container: { 